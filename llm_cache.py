@@ -0,0 +1,85 @@
+import json
+import hashlib
+import diskcache
+
+# ----------------------------
+# Cache for OpenAI chat completions
+# ----------------------------
+class LLMCache:
+    """
+    Wraps chat.completions.create calls on an AsyncOpenAI client with a
+    persistent on-disk cache.
+    Responses are keyed by sha256 of the full request (model, messages,
+    temperature and any other OpenAI arguments) and only cached when
+    temperature == 0, since other calls aren't repeatable. Replies that
+    are empty or didn't finish normally (e.g. cut off by max_tokens) are
+    never cached.
+    With force_deterministic, every call is sent with temperature=0 so
+    it can be cached.
+    """
+
+    def __init__(self, client, directory, force_deterministic=False):
+        self.client = client
+        self.force_deterministic = force_deterministic
+        self.cache = diskcache.Cache(directory)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model, messages, temperature, **kwargs):
+        """
+        Returns the sha256 hex digest identifying a request. Extra kwargs
+        (max_tokens, response_format, ...) are part of the key, since they
+        change the reply.
+        """
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature, **kwargs},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def create(self, model, messages, temperature, **kwargs):
+        """
+        Returns the text of the first completion choice, from the cache
+        when possible. Extra kwargs are passed through to OpenAI.
+        """
+        if self.force_deterministic:
+            temperature = 0
+        key = self.make_key(model, messages, temperature, **kwargs)
+        cacheable = temperature == 0
+
+        if cacheable:
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        response = await self.client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            # Identical prompts share a user id so OpenAI's prompt cache applies
+            user=key,
+            **kwargs
+        )
+        choice = response.choices[0]
+        ai_text = choice.message.content or ""
+        # Only keep complete replies; a truncated one would be served forever
+        if cacheable and choice.finish_reason == "stop" and ai_text:
+            self.cache.set(key, ai_text)
+        return ai_text
+
+    def hit_rate(self):
+        """Returns the fraction of cacheable lookups served from the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Returns a one-line summary of the hit/miss counters."""
+        return f"hits={self.hits} misses={self.misses} hit_rate={self.hit_rate():.0%}"
+
+    def reset_stats(self):
+        """Resets the hit/miss counters (the cached entries are kept)."""
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,393 @@
+import os
+import time
+import random
+import asyncio
+import collections
+import httpx
+import numpy as np
+import orjson
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from llm_cache import LLMCache
+
+# Load environment variables from .env (only once, at the beginning)
+load_dotenv()
+
+# Retrieve API keys from the environment
+FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+
+# On-disk cache of the US symbol list (newline-delimited) and its lifetime
+SYMBOLS_CACHE_FILE = os.getenv("SYMBOLS_CACHE_FILE", "symbols.txt")
+SYMBOLS_CACHE_TTL = 24 * 60 * 60  # The list changes at most daily
+
+# Directory holding the on-disk cache of OpenAI responses
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", ".llm_cache")
+
+# Set OPENAI_DETERMINISTIC=1 to force temperature=0 so every call is cacheable
+OPENAI_DETERMINISTIC = os.getenv("OPENAI_DETERMINISTIC", "0") == "1"
+
+# Maximum number of Finnhub requests in flight at once
+FINNHUB_MAX_CONCURRENCY = int(os.getenv("FINNHUB_MAX_CONCURRENCY", "5"))
+
+# Maximum number of Finnhub requests per minute (60 on the free tier)
+FINNHUB_RATE_LIMIT = int(os.getenv("FINNHUB_RATE_LIMIT", "60"))
+
+# Set DEEP_DIVE=1 to also request an in-depth analysis of each top pick
+DEEP_DIVE = os.getenv("DEEP_DIVE", "0") == "1"
+
+# Stocks whose largest move (see quick_scores) is at or below this fraction
+# are treated as flat and never sent to OpenAI
+QUICK_SCORE_THRESHOLD = float(os.getenv("QUICK_SCORE_THRESHOLD", "0.01"))
+
+# Print a truncated version of the API key to confirm loading
+print("Using API key:", OPENAI_API_KEY[:4] + "..." + OPENAI_API_KEY[-4:])
+
+# Async OpenAI client; its pooled httpx client keeps connections alive
+openai_client = AsyncOpenAI(
+    api_key=OPENAI_API_KEY,
+    http_client=httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20))
+)
+
+# On-disk cache of OpenAI responses, shared by all analysis calls
+llm_cache = LLMCache(openai_client, LLM_CACHE_DIR, force_deterministic=OPENAI_DETERMINISTIC)
+
+# ----------------------------
+# HTTP client shared by all Finnhub requests
+# ----------------------------
+FINNHUB_BASE_URL = "https://finnhub.io/api/v1"
+FINNHUB_RETRY_STATUSES = {429, 500, 502, 503, 504}
+FINNHUB_MAX_RETRIES = 3
+FINNHUB_BACKOFF_FACTOR = 0.3
+
+def create_http_client():
+    """
+    Create the single AsyncClient used for the whole run, so connections
+    are reused (keep-alive + HTTP/2 multiplexing) instead of reopened.
+    The API key is sent as a header rather than a query argument.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20),
+        retries=FINNHUB_MAX_RETRIES  # Retries failed connection attempts
+    )
+    return httpx.AsyncClient(
+        base_url=FINNHUB_BASE_URL,
+        headers={"X-Finnhub-Token": FINNHUB_API_KEY},
+        transport=transport,
+        timeout=httpx.Timeout(20.0)
+    )
+
+class AsyncRateLimiter:
+    """
+    Token bucket allowing at most `rate` acquisitions per `period` seconds,
+    with bursts of up to `rate`.
+    """
+
+    def __init__(self, rate, period=60.0):
+        self.capacity = rate
+        self.tokens = float(rate)
+        self.fill_rate = rate / period
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Waits until a token is available and takes it."""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+async def finnhub_get(client, path, params=None, rate_limiter=None):
+    """
+    GET a Finnhub endpoint and return the decoded JSON body.
+    Rate-limit and server errors are retried with exponential backoff.
+    If a rate_limiter is given, every attempt waits for a token first.
+    """
+    for attempt in range(FINNHUB_MAX_RETRIES + 1):
+        if rate_limiter is not None:
+            await rate_limiter.acquire()
+        resp = await client.get(path, params=params)
+        if resp.status_code not in FINNHUB_RETRY_STATUSES or attempt == FINNHUB_MAX_RETRIES:
+            break
+        await asyncio.sleep(FINNHUB_BACKOFF_FACTOR * 2 ** attempt)
+    resp.raise_for_status()
+    return orjson.loads(resp.content)
+
+# ----------------------------
+# 1) Fetch All US Stock Symbols
+# ----------------------------
+async def get_all_symbols(client):
+    """
+    Fetch a list of US stock symbols from Finnhub (exchange=US).
+    Returns a list of symbol strings.
+    """
+    data = await finnhub_get(client, "/stock/symbol", params={"exchange": "US"})
+    symbols = [item["symbol"] for item in data if "symbol" in item]
+    return symbols
+
+async def get_all_symbols_cached(client):
+    """
+    Returns the US symbol list from SYMBOLS_CACHE_FILE if it is younger
+    than SYMBOLS_CACHE_TTL; otherwise fetches it from Finnhub and rewrites
+    the cache file.
+    """
+    try:
+        is_fresh = os.path.getmtime(SYMBOLS_CACHE_FILE) > time.time() - SYMBOLS_CACHE_TTL
+    except OSError:
+        is_fresh = False
+    if is_fresh:
+        with open(SYMBOLS_CACHE_FILE, "rb") as f:
+            symbols = f.read().decode("utf-8").splitlines()
+        if symbols:
+            return symbols
+
+    symbols = await get_all_symbols(client)
+    # Write to a temporary file and swap it in, so an interrupted write
+    # can't leave a truncated cache that looks fresh
+    tmp_path = SYMBOLS_CACHE_FILE + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(symbols))
+    os.replace(tmp_path, SYMBOLS_CACHE_FILE)
+    return symbols
+
+# ----------------------------
+# 2) Get Quote for a Symbol
+# ----------------------------
+async def get_quote(client, symbol, semaphore, rate_limiter):
+    """
+    Fetch real-time quote data for a single symbol.
+    The semaphore caps how many Finnhub requests run concurrently and the
+    rate limiter keeps them under FINNHUB_RATE_LIMIT per minute.
+    Keys: c (current), h, l, o, pc, t
+    """
+    async with semaphore:
+        return await finnhub_get(client, "/quote", params={"symbol": symbol}, rate_limiter=rate_limiter)
+
+async def get_quotes(client, symbols, semaphore, rate_limiter):
+    """
+    Fetch quotes for several symbols concurrently (one fan-out per tick).
+    Returns a list of {"symbol", "quote", "timestamp"} dicts; failed
+    fetches are reported and skipped.
+    """
+    results = await asyncio.gather(
+        *(get_quote(client, symbol, semaphore, rate_limiter) for symbol in symbols),
+        return_exceptions=True
+    )
+    quotes = []
+    for symbol, result in zip(symbols, results):
+        if isinstance(result, (httpx.HTTPError, orjson.JSONDecodeError)):
+            print(f"[ERROR] Finnhub quote fetch failed for {symbol}: {result}")
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        quotes.append({
+            "symbol": symbol,
+            "quote": result,
+            "timestamp": time.time()
+        })
+    return quotes
+
+# ----------------------------
+# Helper: Visit symbols in shuffled order without repeats
+# ----------------------------
+def next_symbols(symbol_queue, all_symbols, count):
+    """
+    Pops `count` symbols from the pre-shuffled queue, refilling it with a
+    fresh shuffle of all_symbols whenever it runs out. Every symbol is
+    visited once before any symbol is repeated.
+    """
+    symbols = []
+    for _ in range(count):
+        if not symbol_queue:
+            symbol_queue.extend(random.sample(all_symbols, len(all_symbols)))
+        symbols.append(symbol_queue.popleft())
+    return symbols
+
+# ----------------------------
+# Helper: Cheap numeric score to skip OpenAI on flat stocks
+# ----------------------------
+def quick_scores(quotes):
+    """
+    Scores a list of quotes by how much they moved. Returns a float64 array
+    holding, per quote, the larger of |c - pc| / pc (move vs. previous
+    close) and |c - o| / o (intraday move), so a score above
+    QUICK_SCORE_THRESHOLD means the price actually moved by more than
+    that fraction. The day's range is ignored: it has no direction and a
+    wide range with c == pc is still flat. Quotes with a zero open or
+    previous close (e.g. unknown symbols) score 0.
+    """
+    fields = np.array(
+        [(q["c"], q["o"], q["pc"]) for q in quotes], dtype=np.float64
+    ).reshape(-1, 3)
+    c, o, pc = fields.T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        day_move = np.where(pc > 0, np.abs(c - pc) / pc, 0.0)
+        intraday_move = np.where(o > 0, np.abs(c - o) / o, 0.0)
+    return np.maximum(day_move, intraday_move)
+
+# ----------------------------
+# 3) Analyze a Single Stock using OpenAI (optional deep dive)
+# ----------------------------
+# Prompt is pre-compressed: no polite framing, repeated labels or indentation
+ANALYSIS_PROMPT_TEMPLATE = """Analyze stock {symbol}:
+c={c} h={h} l={l} o={o} pc={pc} t={t}
+Consider recent performance, notable price moves, short-term outlook.
+Return JSON: {{"action":"buy|hold|sell","confidence":<0-1>,"short_rationale":"<one sentence>"}}"""
+
+async def analyze_stock_with_openai(symbol, quote):
+    """
+    Sends a single stock's data to OpenAI for an in-depth analysis.
+    Only used when DEEP_DIVE is enabled, on the comparison's top pick.
+    Returns a dict {"action", "confidence", "short_rationale"}; "action" is
+    None if the call or the JSON parsing failed.
+    """
+    prompt = ANALYSIS_PROMPT_TEMPLATE.format_map(quote | {"symbol": symbol})
+    try:
+        ai_text = await llm_cache.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "Financial advisor."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=120,
+            response_format={"type": "json_object"}
+        )
+        result = orjson.loads(ai_text)
+        return {
+            "action": result["action"],
+            "confidence": result.get("confidence"),
+            "short_rationale": result.get("short_rationale", "")
+        }
+    except Exception as e:
+        print(f"[ERROR] OpenAI API call failed for {symbol}: {e}")
+        return {"action": None, "confidence": None, "short_rationale": "OpenAI call failed"}
+
+# ----------------------------
+# 4) Compare All Stocks from Past 1 Minute
+# ----------------------------
+# Prompt is pre-compressed: no polite framing, repeated labels or indentation
+COMPARISON_PROMPT_TEMPLATE = """Stock quotes, last minute:
+{summary_of_stocks}
+Best short/mid-term high-yield pick? Exactly one symbol.
+Return JSON: {{"pick":"<symbol>","reason":"<brief rationale>"}}"""
+
+async def compare_stocks_with_openai(stocks):
+    """
+    Takes a list of (symbol, quote) pairs from the last minute and asks
+    OpenAI, in a single call on the raw quote data, to pick the best
+    high-yield option. Flat stocks are filtered out first by quick_scores;
+    if none are left, OpenAI is not called.
+    Returns a dict {"pick": symbol, "reason": rationale}; "pick" is None
+    if nothing was sent, the call or the JSON parsing failed, or the reply
+    didn't name one of the submitted symbols.
+    """
+    if not stocks:
+        return {"pick": None, "reason": "No quotes fetched"}
+    scores = quick_scores([quote for _, quote in stocks])
+    movers = np.flatnonzero(scores > QUICK_SCORE_THRESHOLD)
+    filtered = len(stocks) - len(movers)
+    print(f"[FILTER] {filtered}/{len(stocks)} flat stocks skipped without OpenAI ({filtered / len(stocks):.0%})")
+    if len(movers) == 0:
+        return {"pick": None, "reason": "hold — all quotes flat"}
+    stocks = [stocks[i] for i in movers]
+
+    rows = [
+        f"{symbol}: c={quote['c']} h={quote['h']} l={quote['l']} o={quote['o']} pc={quote['pc']}"
+        for symbol, quote in stocks
+    ]
+    summary_of_stocks = "\n".join(rows)
+    prompt = COMPARISON_PROMPT_TEMPLATE.format_map({"summary_of_stocks": summary_of_stocks})
+    try:
+        ai_text = await llm_cache.create(
+            model="gpt-3.5-turbo",
+            messages=[
+                {"role": "system", "content": "Stock-picking expert."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.7,
+            max_tokens=150,
+            response_format={"type": "json_object"}
+        )
+        result = orjson.loads(ai_text)
+        pick = result["pick"]
+        reason = result.get("reason", "")
+    except Exception as e:
+        print(f"[ERROR] OpenAI summary call failed: {e}")
+        return {"pick": None, "reason": "OpenAI summary call failed"}
+    # Only accept a pick that is one of the symbols that were sent
+    if not isinstance(pick, str) or pick not in {symbol for symbol, _ in stocks}:
+        print(f"[ERROR] OpenAI picked an unknown symbol: {pick!r}")
+        return {"pick": None, "reason": "OpenAI returned an invalid pick"}
+    return {"pick": pick, "reason": str(reason)}
+
+# ----------------------------
+# 5) Main Loop
+# ----------------------------
+async def main():
+    print("Starting the Stock Analysis Python Script...")
+    try:
+        async with create_http_client() as client:
+            print("Loading all US stock symbols (cached daily from Finnhub)...")
+            all_symbols = await get_all_symbols_cached(client)
+            print(f"Total symbols fetched: {len(all_symbols)}")
+            semaphore = asyncio.Semaphore(FINNHUB_MAX_CONCURRENCY)
+            rate_limiter = AsyncRateLimiter(FINNHUB_RATE_LIMIT)
+            symbol_queue = collections.deque(random.sample(all_symbols, len(all_symbols)))
+            # (symbol, quote) pairs fetched since the last comparison
+            buffered_stocks = []
+            # Size each tick's fan-out and length so fetching stays within
+            # FINNHUB_RATE_LIMIT instead of blocking in the rate limiter
+            quotes_per_tick = max(1, FINNHUB_RATE_LIMIT // 60)
+            tick_seconds = 60 * quotes_per_tick / FINNHUB_RATE_LIMIT
+            last_comparison_time = time.time()
+            comparison_interval = 60  # Change interval to 1 minute (60 seconds)
+
+            while True:
+                loop_start = time.time()
+                comparison_due = loop_start - last_comparison_time >= comparison_interval
+
+                # Take the next shuffled stock symbols and fetch their quotes concurrently
+                symbols = next_symbols(symbol_queue, all_symbols, quotes_per_tick)
+                fetch_task = get_quotes(client, symbols, semaphore, rate_limiter)
+
+                if comparison_due:
+                    print("\n[COMPARISON] 1 minute has passed, comparing all fetched stocks...\n")
+                    # Take the buffer and start a new one; quotes fetched during
+                    # this tick are added to the new buffer, so they go to the
+                    # next comparison
+                    stocks = buffered_stocks
+                    buffered_stocks = []
+                    # Compare in one OpenAI call while the next quotes are being fetched
+                    new_quotes, best_pick = await asyncio.gather(fetch_task, compare_stocks_with_openai(stocks))
+                    if best_pick["pick"] is None:
+                        print(f"[RESULT] No pick among last 1 minute: {best_pick['reason']}")
+                    else:
+                        print("[RESULT] AI's top pick among last 1 minute:\n")
+                        print(f"{best_pick['pick']}: {best_pick['reason']}")
+                    if DEEP_DIVE and best_pick["pick"] is not None:
+                        quote = dict(stocks).get(best_pick["pick"])
+                        if quote is not None:
+                            print("\n[DEEP DIVE]\n")
+                            analysis = await analyze_stock_with_openai(best_pick["pick"], quote)
+                            print(f"{analysis['action']} (confidence {analysis['confidence']}): {analysis['short_rationale']}")
+                    print(f"\n[CACHE] OpenAI response cache: {llm_cache.stats()}")
+                    llm_cache.reset_stats()
+                    print("\n===================================================\n")
+                    last_comparison_time = loop_start
+                else:
+                    new_quotes = await fetch_task
+
+                buffered_stocks.extend((item["symbol"], item["quote"]) for item in new_quotes)
+
+                elapsed = time.time() - loop_start
+                await asyncio.sleep(max(0, tick_seconds - elapsed))
+    finally:
+        # Close the OpenAI client's pooled HTTP connections
+        await openai_client.close()